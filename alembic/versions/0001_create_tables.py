@@ -6,6 +6,7 @@ Create Date: 2026-02-04 00:00:00
 """
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 
 revision = "0001_create_tables"
 down_revision = None
@@ -14,6 +15,18 @@ depends_on = None
 
 
 def upgrade():
+    # DDL is grouped: enum types once up front, then every table, then all secondary indexes.
+    # Unique constraints are declared inline so each lands in its CREATE TABLE statement.
+    # Alembic runs the whole upgrade in one transaction on PostgreSQL (transactional DDL).
+
+    # enums (create_type=False: the column types below must not emit CREATE TYPE again)
+    issue_status = postgresql.ENUM(
+        "open", "in_progress", "resolved", "closed", "rejected", name="issue_status", create_type=False
+    )
+    issue_priority = postgresql.ENUM("low", "medium", "high", "critical", name="issue_priority", create_type=False)
+    issue_status.create(op.get_bind(), checkfirst=True)
+    issue_priority.create(op.get_bind(), checkfirst=True)
+
     # users
     op.create_table(
         "users",
@@ -21,15 +34,13 @@ def upgrade():
         sa.Column("username", sa.String(50), nullable=False),
         sa.Column("email", sa.String(255), nullable=False),
         sa.Column("hashed_password", sa.String(255), nullable=False),
-        sa.Column("is_active", sa.Boolean, nullable=False, server_default=sa.text("1")),
-        sa.Column("is_superuser", sa.Boolean, nullable=False, server_default=sa.text("0")),
+        sa.Column("is_active", sa.Boolean, nullable=False, server_default=sa.true()),
+        sa.Column("is_superuser", sa.Boolean, nullable=False, server_default=sa.false()),
         sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
         sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint("username", name="uq_users_username"),
+        sa.UniqueConstraint("email", name="uq_users_email"),
     )
-    op.create_index("ix_users_username", "users", ["username"], unique=False)
-    op.create_index("ix_users_email", "users", ["email"], unique=False)
-    op.create_unique_constraint("uq_users_username", "users", ["username"])
-    op.create_unique_constraint("uq_users_email", "users", ["email"])
 
     # projects
     op.create_table(
@@ -40,14 +51,8 @@ def upgrade():
         sa.Column("owner_id", sa.Integer, sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
         sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
         sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint("owner_id", "name", name="uq_owner_project_name"),
     )
-    op.create_unique_constraint("uq_owner_project_name", "projects", ["owner_id", "name"])
-
-    # enums
-    issue_status = sa.Enum("open", "in_progress", "resolved", "closed", "rejected", name="issue_status")
-    issue_priority = sa.Enum("low", "medium", "high", "critical", name="issue_priority")
-    issue_status.create(op.get_bind(), checkfirst=True)
-    issue_priority.create(op.get_bind(), checkfirst=True)
 
     # issues
     op.create_table(
@@ -62,9 +67,8 @@ def upgrade():
         sa.Column("assignee_id", sa.Integer, sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
         sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
         sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint("project_id", "title", name="uq_project_issue_title"),
     )
-    op.create_index("ix_issues_project_id_status", "issues", ["project_id", "status"])
-    op.create_unique_constraint("uq_project_issue_title", "issues", ["project_id", "title"])
 
     # comments
     op.create_table(
@@ -75,6 +79,11 @@ def upgrade():
         sa.Column("content", sa.Text, nullable=False),
         sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
     )
+
+    # secondary indexes, once all tables exist
+    op.create_index("ix_users_username", "users", ["username"], unique=False)
+    op.create_index("ix_users_email", "users", ["email"], unique=False)
+    op.create_index("ix_issues_project_id_status", "issues", ["project_id", "status"])
     op.create_index("ix_comments_issue_id", "comments", ["issue_id"])
     op.create_index("ix_comments_author_id", "comments", ["author_id"])
 
@@ -82,16 +91,14 @@ def upgrade():
 def downgrade():
     op.drop_index("ix_comments_author_id", table_name="comments")
     op.drop_index("ix_comments_issue_id", table_name="comments")
-    op.drop_table("comments")
-
     op.drop_index("ix_issues_project_id_status", table_name="issues")
-    op.drop_table("issues")
-    sa.Enum(name="issue_priority").drop(op.get_bind(), checkfirst=True)
-    sa.Enum(name="issue_status").drop(op.get_bind(), checkfirst=True)
-
-    op.drop_table("projects")
-
     op.drop_index("ix_users_email", table_name="users")
     op.drop_index("ix_users_username", table_name="users")
+
+    op.drop_table("comments")
+    op.drop_table("issues")
+    op.drop_table("projects")
     op.drop_table("users")
 
+    sa.Enum(name="issue_priority").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="issue_status").drop(op.get_bind(), checkfirst=True)
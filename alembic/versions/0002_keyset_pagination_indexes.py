@@ -0,0 +1,22 @@
+"""add (created_at, id) indexes for keyset pagination
+
+Revision ID: 0002_keyset_pagination_indexes
+Revises: 0001_create_tables
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+
+revision = "0002_keyset_pagination_indexes"
+down_revision = "0001_create_tables"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_projects_created_at_id", "projects", ["created_at", "id"])
+    op.create_index("ix_issues_created_at_id", "issues", ["created_at", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_issues_created_at_id", table_name="issues")
+    op.drop_index("ix_projects_created_at_id", table_name="projects")
@@ -0,0 +1,45 @@
+"""add composite filter+sort indexes and trigram search indexes
+
+Revision ID: 0003_filter_search_indexes
+Revises: 0002_keyset_pagination_indexes
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_filter_search_indexes"
+down_revision = "0002_keyset_pagination_indexes"
+branch_labels = None
+depends_on = None
+
+# (index, table, column) for ILIKE '%term%' search; pg_trgm makes these index-assisted
+TRGM_INDEXES = [
+    ("ix_issues_title_trgm", "issues", "title"),
+    ("ix_issues_desc_trgm", "issues", "description"),
+    ("ix_projects_name_trgm", "projects", "name"),
+    ("ix_projects_desc_trgm", "projects", "description"),
+]
+
+
+def upgrade():
+    created_desc = sa.text("created_at DESC")
+    op.create_index("ix_issues_assignee_created", "issues", ["assignee_id", created_desc])
+    op.create_index("ix_issues_reporter_created", "issues", ["reporter_id", created_desc])
+    op.create_index("ix_issues_project_status_created", "issues", ["project_id", "status", created_desc])
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, table, column in TRGM_INDEXES:
+            op.create_index(
+                name, table, [column], postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"}
+            )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        for name, table, _ in reversed(TRGM_INDEXES):
+            op.drop_index(name, table_name=table)
+
+    op.drop_index("ix_issues_project_status_created", table_name="issues")
+    op.drop_index("ix_issues_reporter_created", table_name="issues")
+    op.drop_index("ix_issues_assignee_created", table_name="issues")
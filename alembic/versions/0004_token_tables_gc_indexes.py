@@ -0,0 +1,65 @@
+"""create token tables and add indexes for expiry sweeps and reuse detection
+
+Revision ID: 0004_token_tables_gc_indexes
+Revises: 0003_filter_search_indexes
+Create Date: 2026-10-15 00:00:00
+
+refresh_tokens / token_blocklist existed only in the models (created via create_all);
+they are created here so the expiry and reuse-detection indexes have a table to live on.
+Other model/migration drift (e.g. users.role) is not addressed by this revision.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_token_tables_gc_indexes"
+down_revision = "0003_filter_search_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "refresh_tokens",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("jti", sa.String(64), nullable=False),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("revoked", sa.Boolean, nullable=False, server_default=sa.text("false")),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("replaced_by", sa.String(64), nullable=True),
+    )
+    op.create_table(
+        "token_blocklist",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("jti", sa.String(64), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint("jti", name="uq_blocklist_jti"),
+    )
+
+    op.create_index("ix_refresh_tokens_jti", "refresh_tokens", ["jti"], unique=True)
+    op.create_index("ix_refresh_tokens_user_id", "refresh_tokens", ["user_id"])
+    op.create_index("ix_refresh_tokens_replaced_by", "refresh_tokens", ["replaced_by"])
+    op.create_index("ix_refresh_tokens_expires_at", "refresh_tokens", ["expires_at"])
+    op.create_index(
+        "ix_refresh_tokens_active",
+        "refresh_tokens",
+        ["user_id"],
+        postgresql_where=sa.text("revoked = false"),
+        sqlite_where=sa.text("revoked = 0"),
+    )
+    op.create_index("ix_token_blocklist_jti", "token_blocklist", ["jti"], unique=True)
+    op.create_index("ix_token_blocklist_expires_at", "token_blocklist", ["expires_at"])
+
+
+def downgrade():
+    op.drop_index("ix_token_blocklist_expires_at", table_name="token_blocklist")
+    op.drop_index("ix_token_blocklist_jti", table_name="token_blocklist")
+    op.drop_table("token_blocklist")
+
+    op.drop_index("ix_refresh_tokens_active", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_tokens_expires_at", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_tokens_replaced_by", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_tokens_user_id", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_tokens_jti", table_name="refresh_tokens")
+    op.drop_table("refresh_tokens")
@@ -0,0 +1,40 @@
+"""make foreign keys DEFERRABLE INITIALLY DEFERRED
+
+Revision ID: 0005_deferrable_foreign_keys
+Revises: 0004_token_tables_gc_indexes
+Create Date: 2026-10-15 00:00:00
+
+Foreign keys are then checked at COMMIT, so bulk loaders can insert rows of related
+tables in any order within one transaction. PostgreSQL only (ALTER CONSTRAINT).
+"""
+from alembic import op
+
+revision = "0005_deferrable_foreign_keys"
+down_revision = "0004_token_tables_gc_indexes"
+branch_labels = None
+depends_on = None
+
+# (table, constraint) using PostgreSQL's default <table>_<column>_fkey names
+FOREIGN_KEYS = [
+    ("projects", "projects_owner_id_fkey"),
+    ("issues", "issues_project_id_fkey"),
+    ("issues", "issues_reporter_id_fkey"),
+    ("issues", "issues_assignee_id_fkey"),
+    ("comments", "comments_issue_id_fkey"),
+    ("comments", "comments_author_id_fkey"),
+    ("refresh_tokens", "refresh_tokens_user_id_fkey"),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table, name in FOREIGN_KEYS:
+        op.execute(f"ALTER TABLE {table} ALTER CONSTRAINT {name} DEFERRABLE INITIALLY DEFERRED")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table, name in FOREIGN_KEYS:
+        op.execute(f"ALTER TABLE {table} ALTER CONSTRAINT {name} NOT DEFERRABLE")
@@ -0,0 +1,58 @@
+"""key token lookups on a BIGINT hash of the jti
+
+Revision ID: 0006_token_jti_hash
+Revises: 0005_deferrable_foreign_keys
+Create Date: 2026-10-15 00:00:00
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_token_jti_hash"
+down_revision = "0005_deferrable_foreign_keys"
+branch_labels = None
+depends_on = None
+
+
+def _jti_hash(jti: str) -> int:
+    # must match app.auth.jti_hash
+    return int.from_bytes(hashlib.blake2b(jti.encode(), digest_size=8).digest(), "little", signed=True)
+
+
+def _backfill(table_name: str):
+    conn = op.get_bind()
+    t = sa.table(table_name, sa.column("id", sa.Integer), sa.column("jti", sa.String), sa.column("jti_hash", sa.BigInteger))
+    rows = [{"_id": id_, "_hash": _jti_hash(jti)} for id_, jti in conn.execute(sa.select(t.c.id, t.c.jti))]
+    if rows:
+        conn.execute(t.update().where(t.c.id == sa.bindparam("_id")).values(jti_hash=sa.bindparam("_hash")), rows)
+
+
+def upgrade():
+    for table in ("refresh_tokens", "token_blocklist"):
+        op.add_column(table, sa.Column("jti_hash", sa.BigInteger, nullable=True))
+        _backfill(table)
+
+    with op.batch_alter_table("refresh_tokens") as batch:
+        batch.alter_column("jti_hash", existing_type=sa.BigInteger, nullable=False)
+        batch.drop_index("ix_refresh_tokens_jti")
+        batch.create_index("ix_refresh_tokens_jti_hash", ["jti_hash"], unique=True)
+
+    with op.batch_alter_table("token_blocklist") as batch:
+        batch.alter_column("jti_hash", existing_type=sa.BigInteger, nullable=False)
+        batch.drop_index("ix_token_blocklist_jti")
+        batch.drop_constraint("uq_blocklist_jti", type_="unique")
+        batch.create_index("ix_token_blocklist_jti_hash", ["jti_hash"], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table("token_blocklist") as batch:
+        batch.drop_index("ix_token_blocklist_jti_hash")
+        batch.create_unique_constraint("uq_blocklist_jti", ["jti"])
+        batch.create_index("ix_token_blocklist_jti", ["jti"], unique=True)
+        batch.drop_column("jti_hash")
+
+    with op.batch_alter_table("refresh_tokens") as batch:
+        batch.drop_index("ix_refresh_tokens_jti_hash")
+        batch.create_index("ix_refresh_tokens_jti", ["jti"], unique=True)
+        batch.drop_column("jti_hash")
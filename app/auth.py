@@ -1,23 +1,60 @@
+import asyncio
+import hashlib
+import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Tuple
+from typing import List, NamedTuple, Optional, Tuple
 from fastapi import Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from uuid import uuid4
 
-from jose import jwt, JWTError
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from jwt import InvalidTokenError
+from jwt.algorithms import OKPAlgorithm
+from cachetools import TTLCache
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, inspect, select, update
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from app.models import RefreshToken, TokenBlocklist, User
-from app.db import SessionLocal, get_session
-
-PWD_CTX = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.db import SessionLocal, bulk_insert, get_session
+from app.schemas import UserCreate
+
+# argon2id for new hashes; bcrypt stays verifiable and is re-hashed to argon2 on next successful login
+PWD_CTX = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=2,
+    argon2__memory_cost=64 * 1024,
+    argon2__parallelism=2,
+)
+
+# Dedicated pool for password hashing/verification so login bursts don't starve the shared
+# threadpool that sync routes and dependencies run on. argon2/bcrypt release the GIL.
+PASSWORD_POOL = ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 2, thread_name_prefix="password")
 
 ACCESS_TOKEN_EXPIRES = timedelta(minutes=15)
 REFRESH_TOKEN_EXPIRES = timedelta(days=7)
+_ACCESS_TTL_SECONDS = int(ACCESS_TOKEN_EXPIRES.total_seconds())
+_REFRESH_TTL_SECONDS = int(REFRESH_TOKEN_EXPIRES.total_seconds())
+
+# Per-process caches for the per-request auth lookups. The TTLs bound how long a revocation
+# or user change made by another worker can go unseen; changes made here update them directly.
+_CACHE_LOCK = threading.Lock()
+_REVOKED: TTLCache = TTLCache(maxsize=100_000, ttl=60)  # access jti -> revoked?
+_USERS: TTLCache = TTLCache(maxsize=10_000, ttl=30)  # user id -> detached User snapshot
+# user id -> (role, is_active), for permission checks. Kept short on purpose: a demotion or
+# deactivation made by another worker or pod is honoured here only after this TTL. That window is
+# an accepted risk; changes made in this process invalidate the entry immediately.
+_ROLES: TTLCache = TTLCache(maxsize=100_000, ttl=5)
 
-ALGORITHM = "RS256"
+ALGORITHM = "EdDSA"
 
 KEY_DIR = os.path.join(os.path.dirname(__file__), "..", "keys")
 PRIVATE_KEY_PATH = os.environ.get("PRIVATE_KEY_PATH", os.path.join(KEY_DIR, "private.pem"))
@@ -34,7 +71,7 @@ def _load_key(path: str) -> Optional[str]:
 
 def load_keys() -> Tuple[bytes, bytes]:
     """
-    Load or generate RSA keys for RS256 signing.
+    Load or generate Ed25519 keys for EdDSA signing.
     If env vars PRIVATE_KEY / PUBLIC_KEY exist, prefer those.
     """
     priv = os.environ.get("PRIVATE_KEY")
@@ -49,15 +86,10 @@ def load_keys() -> Tuple[bytes, bytes]:
 
     # If not found, generate ephemeral keys (requires cryptography)
     try:
-        from cryptography.hazmat.primitives.asymmetric import rsa
-        from cryptography.hazmat.primitives import serialization, hashes
-        from cryptography.hazmat.primitives.asymmetric import padding
-        from cryptography.hazmat.backends import default_backend
-
-        key = rsa.generate_private_key(public_exponent=65537, key_size=2048, backend=default_backend())
+        key = Ed25519PrivateKey.generate()
         priv_pem = key.private_bytes(
             encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.TraditionalOpenSSL,
+            format=serialization.PrivateFormat.PKCS8,
             encryption_algorithm=serialization.NoEncryption(),
         )
         pub_pem = key.public_key().public_bytes(
@@ -75,11 +107,39 @@ def load_keys() -> Tuple[bytes, bytes]:
             pass
         return priv_pem, pub_pem
     except Exception as exc:
-        raise RuntimeError("RSA key generation failed; provide PRIVATE_KEY/PRIVATE_KEY_PATH") from exc
+        raise RuntimeError("Ed25519 key generation failed; provide PRIVATE_KEY/PRIVATE_KEY_PATH") from exc
 
 
 PRIVATE_KEY, PUBLIC_KEY = load_keys()
 
+# Parse the PEMs once and hand the key objects to PyJWT on every encode/decode.
+_PRIVATE_KEY_OBJ = serialization.load_pem_private_key(PRIVATE_KEY, password=None)
+_PUBLIC_KEY_OBJ = serialization.load_pem_public_key(PUBLIC_KEY)
+if not isinstance(_PRIVATE_KEY_OBJ, Ed25519PrivateKey):
+    raise RuntimeError("EdDSA signing requires an Ed25519 key pair; regenerate PRIVATE_KEY/PUBLIC_KEY")
+
+
+def _build_jwks() -> dict:
+    """Public JWKS; kid is the RFC 7638 thumbprint so clients can pick the right key across rotations."""
+    key = OKPAlgorithm.to_jwk(_PUBLIC_KEY_OBJ, as_dict=True)
+    thumbprint_input = json.dumps({k: key[k] for k in ("crv", "kty", "x")}, separators=(",", ":"), sort_keys=True)
+    digest = hashlib.sha256(thumbprint_input.encode()).digest()
+    kid = jwt.utils.base64url_encode(digest).decode()
+    return {"keys": [{**key, "kid": kid, "alg": ALGORITHM, "use": "sig"}]}
+
+
+JWKS = _build_jwks()
+KEY_ID = JWKS["keys"][0]["kid"]
+
+
+def warm_up():
+    """
+    Exercise hashing and token sign/verify once so backend probing and lazy initialisation
+    are paid before the first request rather than by it.
+    """
+    PWD_CTX.hash("warmup")
+    decode_token(create_access_token(0)[0])
+
 
 def get_password_hash(password: str) -> str:
     return PWD_CTX.hash(password)
@@ -89,147 +149,321 @@ def verify_password(plain: str, hashed: str) -> bool:
     return PWD_CTX.verify(plain, hashed)
 
 
+async def run_in_password_pool(func, *args):
+    """Run a hashing call on PASSWORD_POOL without blocking the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(PASSWORD_POOL, func, *args)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await run_in_password_pool(get_password_hash, password)
+
+
+def bulk_create_users(db: Session, users: List[UserCreate]) -> List[int]:
+    """
+    Create many users in one INSERT round trip and a single commit. Returns the new ids in input order.
+    Password hashing is CPU-bound but releases the GIL, so it is spread over PASSWORD_POOL.
+    """
+    hashes = list(PASSWORD_POOL.map(get_password_hash, [u.password for u in users]))
+    rows = [
+        {"username": u.username, "email": u.email, "hashed_password": h, "is_active": True}
+        for u, h in zip(users, hashes)
+    ]
+    ids = bulk_insert(db, User, rows)
+    db.commit()
+    return ids
+
+
 def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _now_ts() -> int:
+    # token iat/exp are whole epoch seconds; skip the aware-datetime round trip on the hot path
+    return int(time.time())
+
+
+def jti_hash(jti: str) -> int:
+    """
+    64-bit key for token lookups: the first 8 bytes of BLAKE2b(jti) as a signed BIGINT.
+    Lookups also compare the jti text so a hash collision can never match the wrong row.
+    """
+    return int.from_bytes(hashlib.blake2b(jti.encode(), digest_size=8).digest(), "little", signed=True)
+
+
+def _match_jti(model, jti: str):
+    return (model.jti_hash == jti_hash(jti)) & (model.jti == jti)
+
+
 def _jti() -> str:
-    return uuid4().hex
+    # 96 random bits, hex-encoded straight from urandom (no UUID object per token)
+    return os.urandom(12).hex()
 
 
-def create_access_token(user_id: int) -> Tuple[str, datetime]:
-    now = _now()
-    exp = now + ACCESS_TOKEN_EXPIRES
+def create_access_token(user_id: int) -> Tuple[str, int]:
+    """Sign an access token; returns it with its exp as epoch seconds."""
+    now = _now_ts()
+    exp = now + _ACCESS_TTL_SECONDS
     jti = _jti()
     payload = {
         "sub": str(user_id),
-        "exp": int(exp.timestamp()),
-        "iat": int(now.timestamp()),
+        "exp": exp,
+        "iat": now,
         "jti": jti,
         "type": "access",
     }
-    token = jwt.encode(payload, PRIVATE_KEY, algorithm=ALGORITHM)
+    token = jwt.encode(payload, _PRIVATE_KEY_OBJ, algorithm=ALGORITHM, headers={"kid": KEY_ID})
     return token, exp
 
 
-def create_refresh_token(db: Session, user_id: int, replaced_by: Optional[str] = None) -> Tuple[str, datetime, str]:
-    now = _now()
-    exp = now + REFRESH_TOKEN_EXPIRES
+def _build_refresh_token(user_id: int, replaced_by: Optional[str] = None) -> Tuple[str, int, str, dict]:
+    """Sign a refresh token and return it with the refresh_tokens row to persist (not written here)."""
+    now = _now_ts()
+    exp = now + _REFRESH_TTL_SECONDS
     jti = _jti()
     payload = {
         "sub": str(user_id),
-        "exp": int(exp.timestamp()),
-        "iat": int(now.timestamp()),
+        "exp": exp,
+        "iat": now,
         "jti": jti,
         "type": "refresh",
     }
-    token = jwt.encode(payload, PRIVATE_KEY, algorithm=ALGORITHM)
+    token = jwt.encode(payload, _PRIVATE_KEY_OBJ, algorithm=ALGORITHM, headers={"kid": KEY_ID})
+    row = {
+        "jti": jti,
+        "jti_hash": jti_hash(jti),
+        "user_id": user_id,
+        "expires_at": datetime.fromtimestamp(exp, tz=timezone.utc),
+        "revoked": False,
+        "replaced_by": replaced_by,
+    }
+    return token, exp, jti, row
+
+
+def create_refresh_token(db: Session, user_id: int, replaced_by: Optional[str] = None) -> Tuple[str, int, str]:
+    token, exp, jti, row = _build_refresh_token(user_id, replaced_by)
     # persist
-    rt = RefreshToken(
-        jti=jti,
-        user_id=user_id,
-        expires_at=exp,
-        revoked=False,
-        replaced_by=replaced_by,
-    )
-    db.add(rt)
+    db.add(RefreshToken(**row))
     db.commit()
     return token, exp, jti
 
 
 def decode_token(token: str) -> dict:
     try:
-        payload = jwt.decode(token, PUBLIC_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, _PUBLIC_KEY_OBJ, algorithms=[ALGORITHM])
         return payload
-    except JWTError as e:
+    except InvalidTokenError as e:
         raise
 
 
 def revoke_refresh_token(db: Session, jti: str):
-    rt = db.query(RefreshToken).filter(RefreshToken.jti == jti).one_or_none()
+    rt = db.query(RefreshToken).filter(_match_jti(RefreshToken, jti)).one_or_none()
     if rt:
         rt.revoked = True
         db.add(rt)
         db.commit()
 
 
-def is_refresh_token_active(db: Session, jti: str) -> bool:
-    rt = db.query(RefreshToken).filter(RefreshToken.jti == jti).one_or_none()
-    if not rt:
-        return False
-    if rt.revoked:
-        return False
-    if rt.expires_at < _now():
-        return False
-    return True
-
-
-def rotate_refresh_token(db: Session, old_jti: str, user_id: int) -> Tuple[str, datetime, str]:
+def rotate_refresh_token(db: Session, old_jti: str, user_id: int) -> Tuple[str, int, str]:
     """
-    Mark old refresh token as revoked and create a new one linked via replaced_by.
+    Mark old refresh token as revoked and create a new one linked via replaced_by, in one transaction.
+    The conditional UPDATE only matches a token that is still active, so two concurrent rotations of
+    the same token cannot both succeed. Only the rotated row carries replaced_by, so a non-null
+    replaced_by on a rejected token means it was already exchanged and is being replayed.
     """
-    old = db.query(RefreshToken).filter(RefreshToken.jti == old_jti).one_or_none()
-    # detect token reuse: if old exists and already revoked => possible replay
-    if old and old.revoked:
-        # revoke all active refresh tokens for this user
-        db.query(RefreshToken).filter(RefreshToken.user_id == user_id, RefreshToken.revoked == False).update(
-            {"revoked": True}
-        )
-        db.commit()
-        raise HTTPException(status_code=401, detail="Refresh token reuse detected; all refresh tokens revoked")
-
-    # proceed to rotate: create new token and mark old as replaced & revoked
-    new_token, exp, new_jti = create_refresh_token(db, user_id, replaced_by=old_jti)
-    if old:
-        old.revoked = True
-        old.replaced_by = new_jti
-        db.add(old)
-        db.commit()
+    new_token, exp, new_jti, row = _build_refresh_token(user_id)
+    rotated = db.execute(
+        update(RefreshToken)
+        .where(_match_jti(RefreshToken, old_jti), RefreshToken.revoked == False, RefreshToken.expires_at > _now())
+        .values(revoked=True, replaced_by=new_jti)
+        .returning(RefreshToken.user_id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if rotated is None:
+        replaced_by = db.scalar(select(RefreshToken.replaced_by).where(_match_jti(RefreshToken, old_jti)))
+        # detect token reuse: a token that was already rotated is being presented again => possible replay.
+        # Tokens revoked by logout (or expired) were never rotated and are simply rejected.
+        if replaced_by is not None:
+            # revoke all active refresh tokens for this user
+            db.execute(
+                update(RefreshToken)
+                .where(RefreshToken.user_id == user_id, RefreshToken.revoked == False)
+                .values(revoked=True)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            raise HTTPException(status_code=401, detail="Refresh token reuse detected; all refresh tokens revoked")
+        raise HTTPException(status_code=401, detail="Refresh token revoked or expired")
+
+    db.execute(insert(RefreshToken).values(**row))
+    db.commit()
     return new_token, exp, new_jti
 
 
 def add_access_token_to_blocklist(db: Session, jti: str, expires_at: datetime):
-    tb = TokenBlocklist(jti=jti, expires_at=expires_at)
+    tb = TokenBlocklist(jti=jti, jti_hash=jti_hash(jti), expires_at=expires_at)
     db.add(tb)
     db.commit()
+    with _CACHE_LOCK:
+        _REVOKED[jti] = True
 
 
 def is_access_token_revoked(db: Session, jti: str) -> bool:
-    tb = db.query(TokenBlocklist).filter(TokenBlocklist.jti == jti).one_or_none()
-    if not tb:
-        return False
-    if tb.expires_at < _now():
-        return False
-    return True
+    with _CACHE_LOCK:
+        cached = _REVOKED.get(jti)
+    if cached is not None:
+        return cached
+    tb = db.query(TokenBlocklist).filter(_match_jti(TokenBlocklist, jti)).one_or_none()
+    revoked = tb is not None and tb.expires_at >= _now()
+    with _CACHE_LOCK:
+        _REVOKED[jti] = revoked
+    return revoked
+
+
+def get_user_cached(db: Session, user_id: int) -> Optional[User]:
+    """
+    Return the user attached to `db`, served from the per-process cache when possible.
+    The cache holds detached snapshots, which are merged in without a SELECT.
+    """
+    with _CACHE_LOCK:
+        snapshot = _USERS.get(user_id)
+    if snapshot is None:
+        user = db.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+        make_transient_to_detached(snapshot)
+        with _CACHE_LOCK:
+            _USERS[user_id] = snapshot
+        return user
+    return db.merge(snapshot, load=False)
 
 
-def authenticate_user(db: Session, username_or_email: str, password: str) -> Optional[User]:
+def invalidate_user_cache(user_id: int):
+    with _CACHE_LOCK:
+        _USERS.pop(user_id, None)
+        _ROLES.pop(user_id, None)
+
+
+class Principal(NamedTuple):
+    """The authenticated caller as the permission checks see it: just id and role."""
+
+    id: int
+    role: Optional[str]
+
+
+def get_role_cached(db: Session, user_id: int) -> Optional[Tuple[Optional[str], bool]]:
+    """
+    Return (role, is_active) for the user, or None if there is no such user,
+    served from the per-process role cache when possible.
+    """
+    with _CACHE_LOCK:
+        cached = _ROLES.get(user_id)
+    if cached is not None:
+        return cached
+    row = db.execute(select(User.role, User.is_active).where(User.id == user_id)).first()
+    if row is None:
+        return None
+    access = (row.role, row.is_active)
+    with _CACHE_LOCK:
+        _ROLES[user_id] = access
+    return access
+
+
+def get_user_by_login(db: Session, username_or_email: str) -> Optional[User]:
     q = db.query(User)
-    user = q.filter((User.username == username_or_email) | (User.email == username_or_email)).first()
+    return q.filter((User.username == username_or_email) | (User.email == username_or_email)).first()
+
+
+def store_upgraded_hash(db: Session, user: User, new_hash: str):
+    """Persist a re-hashed password (e.g. bcrypt -> argon2id) returned by verify_and_update."""
+    user_id = user.id
+    user.hashed_password = new_hash
+    db.add(user)
+    db.commit()
+    invalidate_user_cache(user_id)
+
+
+def authenticate_user(db: Session, username_or_email: str, password: str) -> Optional[User]:
+    user = get_user_by_login(db, username_or_email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = PWD_CTX.verify_and_update(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        store_upgraded_hash(db, user, new_hash)
     return user
 
 
+async def authenticate_user_async(db: Session, username_or_email: str, password: str) -> Optional[int]:
+    """
+    authenticate_user for async routes: DB work runs on the shared threadpool, the password
+    check on PASSWORD_POOL, and the event loop is never blocked by either.
+    Returns the user id, read before any commit so the caller never touches an expired instance.
+    """
+    user = await run_in_threadpool(get_user_by_login, db, username_or_email)
+    if not user:
+        return None
+    user_id = user.id
+    valid, new_hash = await run_in_password_pool(PWD_CTX.verify_and_update, password, user.hashed_password)
+    if not valid:
+        return None
+    if new_hash:
+        await run_in_threadpool(store_upgraded_hash, db, user, new_hash)
+    return user_id
+
+
 # OAuth2 dependency for FastAPI (used by get_current_user)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_session)) -> User:
+def _decode_access_token(token: str) -> Tuple[int, str]:
+    """Verify an access token (CPU only, no DB) and return (user_id, jti)."""
     try:
         payload = decode_token(token)
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
     if payload.get("type") != "access":
         raise HTTPException(status_code=401, detail="Invalid token type")
-    jti = payload.get("jti")
+    return int(payload.get("sub")), payload.get("jti")
+
+
+def _access_token_user_id(token: str, db: Session) -> int:
+    user_id, jti = _decode_access_token(token)
     if is_access_token_revoked(db, jti):
         raise HTTPException(status_code=401, detail="Token revoked")
-    user_id = int(payload.get("sub"))
-    user = db.get(User, user_id)
+    return user_id
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_session)) -> User:
+    user_id = _access_token_user_id(token, db)
+    user = get_user_cached(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    if not user.is_active:
+        raise HTTPException(status_code=403, detail="Inactive user")
     return user
 
+
+async def get_current_principal(token: str = Depends(oauth2_scheme), db: Session = Depends(get_session)) -> Principal:
+    """
+    Lighter get_current_user for permission checks: resolves only the id, role and active flag,
+    so no User row is loaded or merged into the session. Async so that on cache hits (revocation and role) it runs
+    entirely on the event loop; only cache misses go to the threadpool for their SELECT.
+    """
+    user_id, jti = _decode_access_token(token)
+    with _CACHE_LOCK:
+        revoked = _REVOKED.get(jti)
+        access = _ROLES.get(user_id)
+    if revoked is None:
+        revoked = await run_in_threadpool(is_access_token_revoked, db, jti)
+    if revoked:
+        raise HTTPException(status_code=401, detail="Token revoked")
+    if access is None:
+        access = await run_in_threadpool(get_role_cached, db, user_id)
+        if access is None:
+            raise HTTPException(status_code=404, detail="User not found")
+    role, is_active = access
+    if not is_active:
+        raise HTTPException(status_code=403, detail="Inactive user")
+    return Principal(user_id, role)
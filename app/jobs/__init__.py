@@ -0,0 +1,2 @@
+# background jobs
+__all__ = ["gc"]
@@ -0,0 +1,65 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models import RefreshToken, TokenBlocklist
+
+logger = logging.getLogger(__name__)
+
+# Rows are kept for a day past expiry so recent refresh-token reuse can still be detected.
+EXPIRED_GRACE = timedelta(days=1)
+BATCH_SIZE = 10_000
+SWEEP_INTERVAL_SECONDS = int(os.environ.get("TOKEN_GC_INTERVAL_SECONDS", "3600"))
+# Off by default: every worker of every replica would otherwise run its own sweep.
+# Enable it on exactly one process (e.g. a single-replica deployment).
+ENABLED = os.environ.get("TOKEN_GC_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+def _delete_batch(db: Session, model, cutoff: datetime) -> int:
+    ids = select(model.id).where(model.expires_at < cutoff).limit(BATCH_SIZE).scalar_subquery()
+    result = db.execute(
+        delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def delete_expired(db: Session) -> int:
+    """
+    Delete expired refresh tokens and blocklist entries in batches of BATCH_SIZE,
+    committing after each batch so locks and WAL bursts stay small. Returns rows deleted.
+    """
+    cutoff = datetime.now(timezone.utc) - EXPIRED_GRACE
+    deleted = 0
+    for model in (RefreshToken, TokenBlocklist):
+        while True:
+            n = _delete_batch(db, model, cutoff)
+            deleted += n
+            if n < BATCH_SIZE:
+                break
+    return deleted
+
+
+def _sweep() -> int:
+    db = SessionLocal()
+    try:
+        return delete_expired(db)
+    finally:
+        db.close()
+
+
+async def run_periodically(interval: int = SWEEP_INTERVAL_SECONDS):
+    """Run the sweep forever in a worker thread; meant to be started as an asyncio task."""
+    while True:
+        try:
+            deleted = await asyncio.to_thread(_sweep)
+            if deleted:
+                logger.info("token gc: deleted %d expired rows", deleted)
+        except Exception:
+            logger.exception("token gc sweep failed")
+        await asyncio.sleep(interval)
@@ -1,14 +1,42 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Header
+import asyncio
+import base64
+import threading
+from cachetools import TTLCache
+from fastapi import FastAPI, Depends, HTTPException, Response, status, Header
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Optional, Tuple
 
-from app import models, schemas, auth
-from app.db import get_session
-from sqlalchemy import asc, desc
+from app import models, schemas, auth, permissions
+from app.jobs import gc
+from app.db import get_session, insert_ignore_conflicts
+from sqlalchemy import String, asc, desc, func, literal, select, tuple_
+from sqlalchemy.exc import IntegrityError
 from typing import List
 
-app = FastAPI(title="Backend with JWT RS256 Auth")
+app = FastAPI(title="Backend with JWT EdDSA Auth")
+
+
+@app.on_event("startup")
+def warm_up_auth():
+    auth.warm_up()
+
+
+@app.on_event("startup")
+async def start_token_gc():
+    app.state.token_gc = asyncio.create_task(gc.run_periodically()) if gc.ENABLED else None
+
+
+@app.on_event("shutdown")
+async def stop_token_gc():
+    if app.state.token_gc is not None:
+        app.state.token_gc.cancel()
+
+
+@app.on_event("shutdown")
+def stop_password_pool():
+    auth.PASSWORD_POOL.shutdown(wait=False)
 
 
 # Health endpoints for readiness/liveness
@@ -22,39 +50,75 @@ def ready():
     return {"ready": True}
 
 
-@app.post("/register", response_model=schemas.UserRead)
-def register(user_in: schemas.UserCreate, db: Session = Depends(get_session)):
-    # simple uniqueness checks
-    existing = db.query(models.User).filter(
-        (models.User.username == user_in.username) | (models.User.email == user_in.email)
-    ).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="username or email already registered")
-    user = models.User(
-        username=user_in.username,
-        email=user_in.email,
-        hashed_password=auth.get_password_hash(user_in.password),
-        is_active=True,
+@app.get("/.well-known/jwks.json")
+def jwks():
+    return auth.JWKS
+
+
+def _insert_user(db: Session, user_in: schemas.UserCreate, hashed_password: str) -> models.User:
+    # uniqueness is enforced by the unique constraints; a conflicting row is skipped rather than pre-checked
+    stmt = (
+        insert_ignore_conflicts(db, models.User)
+        .values(
+            username=user_in.username,
+            email=user_in.email,
+            hashed_password=hashed_password,
+            is_active=True,
+        )
+        .returning(models.User)
     )
-    db.add(user)
+    # RETURNING hands back the server defaults with the INSERT, so no follow-up SELECT is needed
+    user = db.scalars(stmt).one_or_none()
+    if user is None:
+        db.rollback()
+        taken = db.scalar(select(models.User.id).where(models.User.username == user_in.username))
+        field = "username" if taken is not None else "email"
+        raise HTTPException(status_code=400, detail=f"{field} already registered")
+    # detach before commit so the loaded row isn't expired and re-fetched during serialization
+    db.expunge(user)
     db.commit()
-    db.refresh(user)
     return user
 
 
+@app.post("/register", response_model=schemas.UserRead)
+async def register(user_in: schemas.UserCreate, db: Session = Depends(get_session)):
+    hashed_password = await auth.get_password_hash_async(user_in.password)
+    return await run_in_threadpool(_insert_user, db, user_in, hashed_password)
+
+
+MAX_BULK_REGISTER = 1000
+
+
+@app.post("/register/bulk", response_model=schemas.BulkRegisterResult)
+def register_bulk(
+    users_in: List[schemas.UserCreate],
+    db: Session = Depends(get_session),
+    _admin: auth.Principal = Depends(permissions.require_roles("admin")),
+):
+    if len(users_in) > MAX_BULK_REGISTER:
+        raise HTTPException(status_code=400, detail=f"at most {MAX_BULK_REGISTER} users per request")
+    try:
+        ids = auth.bulk_create_users(db, users_in)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="username or email already registered")
+    return {"ids": ids}
+
+
 @app.post("/login", response_model=schemas.TokenPair)
-def login(payload: schemas.LoginRequest, db: Session = Depends(get_session)):
+async def login(payload: schemas.LoginRequest, db: Session = Depends(get_session)):
     identifier = payload.username or payload.email
-    user = auth.authenticate_user(db, identifier, payload.password)
-    if not user:
+    user_id = await auth.authenticate_user_async(db, identifier, payload.password)
+    if user_id is None:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    access_token, access_exp = auth.create_access_token(user.id)
-    refresh_token, refresh_exp, refresh_jti = auth.create_refresh_token(db, user.id)
+    access_token, access_exp = auth.create_access_token(user_id)
+    refresh_token, refresh_exp, refresh_jti = await run_in_threadpool(auth.create_refresh_token, db, user_id)
+    now = auth._now_ts()
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
-        "access_expires_in": int((access_exp - datetime.now(timezone.utc)).total_seconds()),
-        "refresh_expires_in": int((refresh_exp - datetime.now(timezone.utc)).total_seconds()),
+        "access_expires_in": access_exp - now,
+        "refresh_expires_in": refresh_exp - now,
     }
 
 
@@ -68,16 +132,15 @@ def refresh(req: schemas.RefreshRequest, db: Session = Depends(get_session)):
         raise HTTPException(status_code=400, detail="Token is not a refresh token")
     jti = payload.get("jti")
     user_id = int(payload.get("sub"))
-    if not auth.is_refresh_token_active(db, jti):
-        raise HTTPException(status_code=401, detail="Refresh token revoked or expired")
-    # rotate
+    # rotate (also rejects revoked/expired tokens and detects reuse)
     new_refresh_token, new_refresh_exp, new_jti = auth.rotate_refresh_token(db, jti, user_id)
     access_token, access_exp = auth.create_access_token(user_id)
+    now = auth._now_ts()
     return {
         "access_token": access_token,
         "refresh_token": new_refresh_token,
-        "access_expires_in": int((access_exp - datetime.now(timezone.utc)).total_seconds()),
-        "refresh_expires_in": int((new_refresh_exp - datetime.now(timezone.utc)).total_seconds()),
+        "access_expires_in": access_exp - now,
+        "refresh_expires_in": new_refresh_exp - now,
     }
 
 
@@ -116,10 +179,132 @@ def me(current_user: models.User = Depends(auth.get_current_user)):
     return current_user
 
 
+# Keyset pagination: the cursor is the (sort value, id) of the last row on the previous page,
+# so a page is an index range scan of per_page rows regardless of how deep it is.
+
+
+def _encode_cursor(sort_col, order: str, value, row_id: int) -> str:
+    raw = value.isoformat() if isinstance(value, datetime) else str(value)
+    return base64.urlsafe_b64encode(f"{sort_col.key}|{order}|{raw}|{row_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str, sort_col, order: str) -> Tuple[object, int]:
+    try:
+        sort_key, cursor_order, rest = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 2)
+        raw, row_id = rest.rsplit("|", 1)
+        python_type = sort_col.type.python_type
+        value = datetime.fromisoformat(raw) if python_type is datetime else python_type(raw)
+        row_id = int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if (sort_key, cursor_order) != (sort_col.key, order):
+        raise HTTPException(status_code=400, detail="Cursor does not match sort_by/sort_order")
+    return value, row_id
+
+
+_SORT_DIRECTIONS = {"asc": asc, "desc": desc}
+
+
+def _cursor_bound(db: Session, value):
+    """
+    Cursor value to compare the bare sort column against (keeping the (sort column, id) index usable).
+    SQLite stores server-default timestamps as "YYYY-MM-DD HH:MM:SS" text while a bound DateTime is
+    rendered as "... HH:MM:SS.ffffff", so there the value is bound as text in the stored format.
+    """
+    if isinstance(value, datetime) and db.get_bind().dialect.name == "sqlite":
+        return literal(value.replace(tzinfo=None).isoformat(sep=" "), String())
+    return value
+
+
+def _paginate(db: Session, stmt, sort_col, id_col, sort_order: str, page: int, per_page: int, after: Optional[str]):
+    order = "asc" if sort_order.lower() == "asc" else "desc"
+    direction = _SORT_DIRECTIONS[order]
+    stmt = stmt.order_by(direction(sort_col), direction(id_col))
+    if after:
+        value, last_id = _decode_cursor(after, sort_col, order)
+        key = tuple_(sort_col, id_col)
+        bound = tuple_(_cursor_bound(db, value), last_id)
+        stmt = stmt.where(key < bound if order == "desc" else key > bound)
+    else:
+        stmt = stmt.offset((page - 1) * per_page)
+    # one extra row tells whether another page exists, so next_cursor never points at an empty page
+    items = db.execute(stmt.limit(per_page + 1)).all()
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        next_cursor = _encode_cursor(sort_col, order, getattr(last, sort_col.key), last.id)
+    return items, next_cursor
+
+
+# COUNT(*) scans every matching row, so totals are cached per filter set for a few seconds.
+# Bounded TTL cache + lock, same pattern as the auth caches.
+COUNT_CACHE_TTL = 5.0
+_COUNT_CACHE_LOCK = threading.Lock()
+_COUNT_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=COUNT_CACHE_TTL)  # filter key -> total
+
+
+def _cached_count(db: Session, key: tuple, stmt) -> int:
+    with _COUNT_CACHE_LOCK:
+        total = _COUNT_CACHE.get(key)
+    if total is not None:
+        return total
+    total = db.scalar(select(func.count()).select_from(stmt.subquery()))
+    with _COUNT_CACHE_LOCK:
+        _COUNT_CACHE[key] = total
+    return total
+
+
+# List endpoints select only the columns their read schemas expose and return plain rows,
+# skipping ORM entity construction and the identity map.
+_PROJECT_COLUMNS = (
+    models.Project.id,
+    models.Project.name,
+    models.Project.description,
+    models.Project.owner_id,
+    models.Project.created_at,
+)
+_ISSUE_COLUMNS = (
+    models.Issue.id,
+    models.Issue.title,
+    models.Issue.description,
+    models.Issue.status,
+    models.Issue.priority,
+    models.Issue.project_id,
+    models.Issue.reporter_id,
+    models.Issue.assignee_id,
+    models.Issue.created_at,
+)
+
+# Allowed sort_by values, resolved to columns once at import
+_PROJECT_SORT = {
+    "name": models.Project.name,
+    "created_at": models.Project.created_at,
+    "id": models.Project.id,
+}
+_ISSUE_SORT = {
+    "created_at": models.Issue.created_at,
+    "priority": models.Issue.priority,
+    "status": models.Issue.status,
+    "id": models.Issue.id,
+}
+
+
+# The list endpoints validate and serialize the page with the prebuilt adapter for their
+# response_model, in one pass straight to JSON bytes, so the output matches response_model's.
+def _json_page(adapter, rows, total: int, page: int, per_page: int, next_cursor: Optional[str]) -> Response:
+    body = adapter.validate_python(
+        {"items": rows, "total": total, "page": page, "per_page": per_page, "next_cursor": next_cursor},
+        from_attributes=True,
+    )
+    return Response(adapter.dump_json(body), media_type="application/json")
+
+
 @app.get("/projects", response_model=schemas.PaginatedProjects)
 def list_projects(
     page: int = 1,
     per_page: int = 20,
+    after: Optional[str] = None,
     search: Optional[str] = None,
     owner_id: Optional[int] = None,
     sort_by: str = "created_at",
@@ -130,30 +315,27 @@ def list_projects(
     page = max(1, page)
     per_page = max(1, min(100, per_page))
 
-    q = db.query(models.Project)
+    stmt = select(*_PROJECT_COLUMNS)
     if search:
         term = f"%{search}%"
-        q = q.filter((models.Project.name.ilike(term)) | (models.Project.description.ilike(term)))
+        stmt = stmt.where((models.Project.name.ilike(term)) | (models.Project.description.ilike(term)))
     if owner_id is not None:
-        q = q.filter(models.Project.owner_id == owner_id)
+        stmt = stmt.where(models.Project.owner_id == owner_id)
 
-    total = q.count()
+    total = _cached_count(db, ("projects", search, owner_id), stmt)
 
     # sorting
-    allowed_sort_fields = {"name", "created_at", "id"}
-    if sort_by not in allowed_sort_fields:
-        sort_by = "created_at"
-    sort_col = getattr(models.Project, sort_by)
-    q = q.order_by(desc(sort_col) if sort_order.lower() == "desc" else asc(sort_col))
+    sort_col = _PROJECT_SORT.get(sort_by) or _PROJECT_SORT["created_at"]
 
-    items = q.offset((page - 1) * per_page).limit(per_page).all()
-    return {"items": items, "total": total, "page": page, "per_page": per_page}
+    rows, next_cursor = _paginate(db, stmt, sort_col, models.Project.id, sort_order, page, per_page, after)
+    return _json_page(schemas.PAGINATED_PROJECTS_ADAPTER, rows, total, page, per_page, next_cursor)
 
 
 @app.get("/issues", response_model=schemas.PaginatedIssues)
 def list_issues(
     page: int = 1,
     per_page: int = 20,
+    after: Optional[str] = None,
     search: Optional[str] = None,
     project_id: Optional[int] = None,
     status: Optional[str] = None,
@@ -167,29 +349,24 @@ def list_issues(
     page = max(1, page)
     per_page = max(1, min(100, per_page))
 
-    q = db.query(models.Issue)
+    stmt = select(*_ISSUE_COLUMNS)
     if search:
         term = f"%{search}%"
-        q = q.filter((models.Issue.title.ilike(term)) | (models.Issue.description.ilike(term)))
+        stmt = stmt.where((models.Issue.title.ilike(term)) | (models.Issue.description.ilike(term)))
     if project_id is not None:
-        q = q.filter(models.Issue.project_id == project_id)
+        stmt = stmt.where(models.Issue.project_id == project_id)
     if status is not None:
-        q = q.filter(models.Issue.status == status)
+        stmt = stmt.where(models.Issue.status == status)
     if priority is not None:
-        q = q.filter(models.Issue.priority == priority)
+        stmt = stmt.where(models.Issue.priority == priority)
     if assignee_id is not None:
-        q = q.filter(models.Issue.assignee_id == assignee_id)
+        stmt = stmt.where(models.Issue.assignee_id == assignee_id)
     if reporter_id is not None:
-        q = q.filter(models.Issue.reporter_id == reporter_id)
-
-    total = q.count()
+        stmt = stmt.where(models.Issue.reporter_id == reporter_id)
 
-    allowed_sort_fields = {"created_at", "priority", "status", "id"}
-    if sort_by not in allowed_sort_fields:
-        sort_by = "created_at"
-    sort_col = getattr(models.Issue, sort_by)
-    q = q.order_by(desc(sort_col) if sort_order.lower() == "desc" else asc(sort_col))
+    total = _cached_count(db, ("issues", search, project_id, status, priority, assignee_id, reporter_id), stmt)
 
-    items = q.offset((page - 1) * per_page).limit(per_page).all()
-    return {"items": items, "total": total, "page": page, "per_page": per_page}
+    sort_col = _ISSUE_SORT.get(sort_by) or _ISSUE_SORT["created_at"]
 
+    rows, next_cursor = _paginate(db, stmt, sort_col, models.Issue.id, sort_order, page, per_page, after)
+    return _json_page(schemas.PAGINATED_ISSUES_ADAPTER, rows, total, page, per_page, next_cursor)
@@ -1,4 +1,5 @@
 from sqlalchemy import (
+    BigInteger,
     Column,
     Integer,
     String,
@@ -71,7 +72,7 @@ class Project(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String(150), nullable=False)
     description = Column(Text, nullable=True)
-    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE", deferrable=True, initially="DEFERRED"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
@@ -80,7 +81,11 @@ class Project(Base):
     owner = relationship("User", back_populates="projects")
     issues = relationship("Issue", back_populates="project", cascade="all, delete-orphan")
 
-    __table_args__ = (UniqueConstraint("owner_id", "name", name="uq_owner_project_name"),)
+    __table_args__ = (
+        UniqueConstraint("owner_id", "name", name="uq_owner_project_name"),
+        Index("ix_projects_created_at_id", "created_at", "id"),
+        # pg_trgm GIN indexes on name/description are PostgreSQL-only and live in migration 0003
+    )
 
 
 class Issue(Base):
@@ -90,9 +95,9 @@ class Issue(Base):
     description = Column(Text, nullable=True)
     status = Column(IssueStatus, nullable=False, server_default="open")
     priority = Column(IssuePriority, nullable=False, server_default="medium")
-    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
-    reporter_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
-    assignee_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE", deferrable=True, initially="DEFERRED"), nullable=False)
+    reporter_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL", deferrable=True, initially="DEFERRED"), nullable=True)
+    assignee_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL", deferrable=True, initially="DEFERRED"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
@@ -105,6 +110,11 @@ class Issue(Base):
 
     __table_args__ = (
         Index("ix_issues_project_id_status", "project_id", "status"),
+        Index("ix_issues_created_at_id", "created_at", "id"),
+        Index("ix_issues_assignee_created", "assignee_id", created_at.desc()),
+        Index("ix_issues_reporter_created", "reporter_id", created_at.desc()),
+        Index("ix_issues_project_status_created", "project_id", "status", created_at.desc()),
+        # pg_trgm GIN indexes on title/description are PostgreSQL-only and live in migration 0003
         UniqueConstraint("project_id", "title", name="uq_project_issue_title"),
     )
 
@@ -112,8 +122,8 @@ class Issue(Base):
 class Comment(Base):
     __tablename__ = "comments"
     id = Column(Integer, primary_key=True)
-    issue_id = Column(Integer, ForeignKey("issues.id", ondelete="CASCADE"), nullable=False, index=True)
-    author_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+    issue_id = Column(Integer, ForeignKey("issues.id", ondelete="CASCADE", deferrable=True, initially="DEFERRED"), nullable=False, index=True)
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL", deferrable=True, initially="DEFERRED"), nullable=True, index=True)
     content = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
@@ -129,22 +139,33 @@ from datetime import datetime
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
     id = Column(Integer, primary_key=True)
-    jti = Column(String(64), nullable=False, unique=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # lookups go through the 8-byte jti_hash (see auth.jti_hash); jti is kept for the equality re-check
+    jti = Column(String(64), nullable=False)
+    jti_hash = Column(BigInteger, nullable=False, unique=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE", deferrable=True, initially="DEFERRED"), nullable=False, index=True)
     revoked = Column(Boolean, nullable=False, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    expires_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
     replaced_by = Column(String(64), nullable=True, index=True)
 
     user = relationship("User")
 
+    __table_args__ = (
+        # partial index for the "revoke all active tokens of a user" reuse-detection scan
+        Index(
+            "ix_refresh_tokens_active",
+            "user_id",
+            postgresql_where=(revoked == False),
+            sqlite_where=(revoked == False),
+        ),
+    )
+
 
 class TokenBlocklist(Base):
     __tablename__ = "token_blocklist"
     id = Column(Integer, primary_key=True)
-    jti = Column(String(64), nullable=False, unique=True, index=True)
+    jti = Column(String(64), nullable=False)
+    jti_hash = Column(BigInteger, nullable=False, unique=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    expires_at = Column(DateTime(timezone=True), nullable=False)
-
-    __table_args__ = (UniqueConstraint("jti", name="uq_blocklist_jti"),)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
 
@@ -1,6 +1,8 @@
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import exists, false, or_, select, true
 from sqlalchemy.orm import Session
-from typing import Callable, Iterable
+from typing import Iterable
 
 from app import models
 from app.db import get_session
@@ -23,56 +25,102 @@ def _forbidden(detail: str = "Forbidden") -> HTTPException:
     return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
 
 
-def require_roles(*allowed_roles: Iterable[str]) -> Callable:
+class RequireRoles:
     """
-    Returns a dependency that ensures current_user.role is in allowed_roles or is admin.
-    Usage: Depends(require_roles("manager", "developer"))
+    Dependency that ensures current_user.role is in roles or is admin.
+    Instances with the same role set compare and hash equal, so FastAPI's per-request dependency
+    cache treats equivalent checks declared in different places as one dependency.
+    Usage: Depends(RequireRoles({"manager", "developer"}))
     """
 
-    async def dependency(current_user: models.User = Depends(auth.get_current_user)):
-        role = getattr(current_user, "role", None)
-        if role == "admin" or role in allowed_roles:
+    def __init__(self, roles: Iterable[str]):
+        # admin always passes, so it is folded into the allowlist once instead of compared per request
+        self.roles = frozenset(roles) | {"admin"}
+
+    def __hash__(self) -> int:
+        return hash(self.roles)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, RequireRoles) and self.roles == other.roles
+
+    async def __call__(self, current_user: auth.Principal = Depends(auth.get_current_principal)) -> auth.Principal:
+        if current_user.role in self.roles:
             return current_user
         raise _forbidden()
 
-    return dependency
+
+def require_roles(*allowed_roles: str) -> RequireRoles:
+    """
+    Returns a dependency that ensures current_user.role is in allowed_roles or is admin.
+    Usage: Depends(require_roles("manager", "developer"))
+    """
+    return RequireRoles(allowed_roles)
+
+
+def _project_exists(db: Session, project_id: int) -> bool:
+    return db.scalar(select(exists().where(models.Project.id == project_id)))
+
+
+def _can_manage_project(db: Session, project_id: int, current_user: auth.Principal) -> bool:
+    privileged = current_user.role in ("admin", "manager")
+    return db.scalar(
+        select(
+            exists().where(
+                models.Project.id == project_id,
+                or_(models.Project.owner_id == current_user.id, true() if privileged else false()),
+            )
+        )
+    )
 
 
-def require_project_owner_or_manager(project_id: int, db: Session = Depends(get_session), current_user: models.User = Depends(auth.get_current_user)):
-    project = db.get(models.Project, project_id)
-    if not project:
+# Roles that may act on any issue regardless of reporter/assignee.
+_ISSUE_OVERRIDE_ROLES = frozenset({"admin", "manager"})
+
+# The dependencies below are async so the pure-Python checks run on the event loop;
+# only the sync Session calls are pushed to the threadpool.
+
+
+async def require_project_owner_or_manager(project_id: int, db: Session = Depends(get_session), current_user: auth.Principal = Depends(auth.get_current_principal)) -> int:
+    """
+    Authorize with a primary-key EXISTS probe instead of loading the project row.
+    Returns the project id; endpoints that need the columns load the project themselves.
+    """
+    if await run_in_threadpool(_can_manage_project, db, project_id, current_user):
+        return project_id
+    # only the failure path pays a second probe to tell "missing" from "not yours"
+    if not await run_in_threadpool(_project_exists, db, project_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    if current_user.role == "admin" or project.owner_id == current_user.id or current_user.role == "manager":
-        return project
     raise _forbidden()
 
 
-def require_issue_reporter_or_roles(issue_id: int, db: Session = Depends(get_session), current_user: models.User = Depends(auth.get_current_user)):
-    issue = db.get(models.Issue, issue_id)
+async def load_issue(issue_id: int, db: Session = Depends(get_session)) -> models.Issue:
+    """
+    Load the issue from the path or 404. Module-level so FastAPI's per-request dependency cache
+    shares one SELECT between the permission dependency and the endpoint (Depends(load_issue)).
+    The full row is loaded (description included) because endpoints serialize the same instance.
+    """
+    issue = await run_in_threadpool(db.get, models.Issue, issue_id)
     if not issue:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue not found")
-    if current_user.role == "admin" or issue.reporter_id == current_user.id or current_user.role in ("manager",):
+    return issue
+
+
+async def require_issue_reporter_or_roles(issue: models.Issue = Depends(load_issue), current_user: auth.Principal = Depends(auth.get_current_principal)):
+    if current_user.role in _ISSUE_OVERRIDE_ROLES or issue.reporter_id == current_user.id:
         return issue
     raise _forbidden()
 
 
-def require_issue_assignee_or_roles(issue_id: int, db: Session = Depends(get_session), current_user: models.User = Depends(auth.get_current_user)):
-    issue = db.get(models.Issue, issue_id)
-    if not issue:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue not found")
-    if current_user.role == "admin" or issue.assignee_id == current_user.id or current_user.role in ("manager",):
+async def require_issue_assignee_or_roles(issue: models.Issue = Depends(load_issue), current_user: auth.Principal = Depends(auth.get_current_principal)):
+    if current_user.role in _ISSUE_OVERRIDE_ROLES or issue.assignee_id == current_user.id:
         return issue
     raise _forbidden()
 
 
-def require_issue_participant_or_manager(issue_id: int, db: Session = Depends(get_session), current_user: models.User = Depends(auth.get_current_user)):
+async def require_issue_participant_or_manager(issue: models.Issue = Depends(load_issue), current_user: auth.Principal = Depends(auth.get_current_principal)):
     """
     Allows reporter, assignee, manager, admin to act on the issue.
     """
-    issue = db.get(models.Issue, issue_id)
-    if not issue:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue not found")
-    if current_user.role == "admin" or current_user.role == "manager" or issue.reporter_id == current_user.id or issue.assignee_id == current_user.id:
+    if current_user.role in _ISSUE_OVERRIDE_ROLES or current_user.id in (issue.reporter_id, issue.assignee_id):
         return issue
     raise _forbidden()
-
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, root_validator
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, TypeAdapter, model_validator
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -10,13 +10,17 @@ class UserCreate(BaseModel):
 
 
 class UserRead(BaseModel):
+    # values come from the DB, already validated on the way in; plain str skips email-validator per response
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     username: str
-    email: EmailStr
+    email: str
     is_active: bool
 
-    class Config:
-        orm_mode = True
+
+class BulkRegisterResult(BaseModel):
+    ids: List[int]
 
 
 class TokenPair(BaseModel):
@@ -28,56 +32,51 @@ class TokenPair(BaseModel):
 
 
 class LoginRequest(BaseModel):
-    username: Optional[str]
-    email: Optional[EmailStr]
+    username: Optional[str] = None
+    email: Optional[EmailStr] = None
     password: str
 
-    @root_validator
-    def one_of_username_or_email(cls, values):
-        username, email = values.get("username"), values.get("email")
-        if not username and not email:
+    @model_validator(mode="after")
+    def one_of_username_or_email(self):
+        if not self.username and not self.email:
             raise ValueError("Either username or email must be provided")
-        return values
+        return self
 
 
 class RefreshRequest(BaseModel):
     refresh_token: str
 
 
-from typing import List
-
-
 class ProjectRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
-    description: Optional[str]
+    description: Optional[str] = None
     owner_id: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
-
 
 class IssueRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     title: str
-    description: Optional[str]
+    description: Optional[str] = None
     status: str
     priority: str
     project_id: int
-    reporter_id: Optional[int]
-    assignee_id: Optional[int]
+    reporter_id: Optional[int] = None
+    assignee_id: Optional[int] = None
     created_at: datetime
 
-    class Config:
-        orm_mode = True
-
 
 class PaginatedProjects(BaseModel):
     items: List[ProjectRead]
     total: int
     page: int
     per_page: int
+    next_cursor: Optional[str] = None
 
 
 class PaginatedIssues(BaseModel):
@@ -85,3 +84,9 @@ class PaginatedIssues(BaseModel):
     total: int
     page: int
     per_page: int
+    next_cursor: Optional[str] = None
+
+
+# Built once at import and reused by the list endpoints to validate and dump whole pages to JSON
+PAGINATED_PROJECTS_ADAPTER = TypeAdapter(PaginatedProjects)
+PAGINATED_ISSUES_ADAPTER = TypeAdapter(PaginatedIssues)
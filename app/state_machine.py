@@ -1,33 +1,60 @@
-from typing import Dict, Set
+import sys
+from typing import Callable, Dict, FrozenSet
 from fastapi import HTTPException, status
+from sqlalchemy import exists, select, update
 from sqlalchemy.orm import Session
 
 from app import models
 
 
+OPEN = sys.intern("open")
+IN_PROGRESS = sys.intern("in_progress")
+RESOLVED = sys.intern("resolved")
+CLOSED = sys.intern("closed")
+REJECTED = sys.intern("rejected")
+
 # Define allowed transitions for the Issue state machine
-ALLOWED_TRANSITIONS: Dict[str, Set[str]] = {
-    "open": {"in_progress", "rejected"},
-    "in_progress": {"resolved", "closed", "rejected"},
-    "resolved": {"closed", "in_progress"},
-    "closed": {"open"},
-    "rejected": {"open"},
+ALLOWED_TRANSITIONS: Dict[str, FrozenSet[str]] = {
+    OPEN: frozenset({IN_PROGRESS, REJECTED}),
+    IN_PROGRESS: frozenset({RESOLVED, CLOSED, REJECTED}),
+    RESOLVED: frozenset({CLOSED, IN_PROGRESS}),
+    CLOSED: frozenset({OPEN}),
+    REJECTED: frozenset({OPEN}),
 }
 
 
-def validate_transition(current: str, target: str):
-    if current == target:
-        return
-    allowed = ALLOWED_TRANSITIONS.get(current, set())
-    if target not in allowed:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid status transition from '{current}' to '{target}'",
-        )
+def _invalid_transition(current: str, target: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Invalid status transition from '{current}' to '{target}'",
+    )
+
+
+def _make_validator(current: str, targets: FrozenSet[str]) -> Callable[[str], None]:
+    # staying in the same status is always allowed, so it is folded into the accepted set
+    accepted = targets | {current}
+
+    def validate(target: str):
+        if target not in accepted:
+            raise _invalid_transition(current, target)
+
+    return validate
 
 
-def _count_issue_comments(db: Session, issue_id: int) -> int:
-    return db.query(models.Comment).filter(models.Comment.issue_id == issue_id).count()
+# One specialised check per source status, built once at import: validating is a single dict
+# fetch plus one frozenset membership test against that status's own targets.
+_VALIDATORS: Dict[str, Callable[[str], None]] = {
+    current: _make_validator(current, targets) for current, targets in ALLOWED_TRANSITIONS.items()
+}
+
+
+def validate_transition(current: str, target: str):
+    validator = _VALIDATORS.get(current)
+    if validator is None:
+        if current == target:
+            return
+        raise _invalid_transition(current, target)
+    validator(target)
 
 
 def change_issue_status(db: Session, issue_id: int, new_status: str, actor_user: models.User) -> models.Issue:
@@ -36,20 +63,31 @@ def change_issue_status(db: Session, issue_id: int, new_status: str, actor_user:
 
     Business rule: Prevent closing a CRITICAL priority issue unless it has at least one comment.
     """
-    issue = db.get(models.Issue, issue_id)
-    if not issue:
+    new_status = sys.intern(str(new_status))
+
+    columns = [models.Issue.status, models.Issue.priority]
+    if new_status == CLOSED:
+        # the comment rule only applies to closing; fetch it in the same round trip as the issue.
+        # EXISTS stops at the first matching row instead of counting every comment on the issue.
+        columns.append(exists().where(models.Comment.issue_id == models.Issue.id).label("has_comment"))
+    row = db.execute(select(*columns).where(models.Issue.id == issue_id)).first()
+    if row is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue not found")
 
-    current = str(issue.status)
-    new_status = str(new_status)
+    # status/priority are string Enum columns, so they already come back as str
+    current = row.status
+
+    # Same status (retries, re-submits): nothing to write. db.get is served from the identity map
+    # when the issue was already loaded in this session (e.g. by permissions.load_issue).
+    if current == new_status:
+        return db.get(models.Issue, issue_id)
 
     # Validate allowed transition
     validate_transition(current, new_status)
 
     # Business rule: cannot close critical issue w/o comments
-    if new_status == "closed" and str(issue.priority) == "critical":
-        comment_count = _count_issue_comments(db, issue_id)
-        if comment_count < 1:
+    if new_status == CLOSED and row.priority == "critical":
+        if not row.has_comment:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Critical issues require at least one comment before closing",
@@ -57,9 +95,24 @@ def change_issue_status(db: Session, issue_id: int, new_status: str, actor_user:
 
     # (Optional) additional checks could be added here (e.g., role-based checks)
 
-    issue.status = new_status
-    db.add(issue)
+    # Conditional on the status we validated against, so a concurrent transition can't be overwritten;
+    # RETURNING loads the updated row, so no refresh SELECT is needed. populate_existing makes an
+    # instance already in the identity map (e.g. from permissions.load_issue) take the new values.
+    already_loaded = db.identity_key(models.Issue, issue_id) in db.identity_map
+    issue = db.execute(
+        update(models.Issue)
+        .where(models.Issue.id == issue_id, models.Issue.status == current)
+        .values(status=new_status)
+        .returning(models.Issue)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    ).scalar_one_or_none()
+    if issue is None:
+        db.rollback()
+        if db.scalar(select(models.Issue.id).where(models.Issue.id == issue_id)) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue not found")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Issue status was changed concurrently")
+    if not already_loaded:
+        # nobody else holds this instance: detach it so commit doesn't expire it and force a re-fetch
+        db.expunge(issue)
     db.commit()
-    db.refresh(issue)
     return issue
-
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import uuid
+
+# Configure the app before it is imported: CI provides DATABASE_URL (Postgres); locally fall back to
+# a throwaway SQLite file, and keep generated signing keys out of the repo's keys/ directory.
+_TMP_DIR = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_TMP_DIR}/test.db")
+os.environ.setdefault("PRIVATE_KEY_PATH", os.path.join(_TMP_DIR, "private.pem"))
+os.environ.setdefault("PUBLIC_KEY_PATH", os.path.join(_TMP_DIR, "public.pem"))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import auth, models
+from app.db import SessionLocal, engine
+from app.main import app
+
+models.Base.metadata.create_all(bind=engine)
+
+PASSWORD = "s3cret-pass"
+
+
+def unique(prefix: str) -> str:
+    return f"{prefix}-{uuid.uuid4().hex[:10]}"
+
+
+def bearer(tokens: dict) -> dict:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def make_user(db):
+    def _make_user(role: str = "developer") -> models.User:
+        name = unique("user")
+        user = models.User(
+            username=name,
+            email=f"{name}@example.com",
+            hashed_password=auth.get_password_hash(PASSWORD),
+            is_active=True,
+            role=role,
+        )
+        db.add(user)
+        db.commit()
+        return user
+
+    return _make_user
+
+
+@pytest.fixture
+def project(db, make_user):
+    owner = make_user()
+    project = models.Project(name=unique("proj"), owner_id=owner.id)
+    db.add(project)
+    db.commit()
+    return project
+
+
+@pytest.fixture
+def login(client):
+    def _login(user: models.User) -> dict:
+        resp = client.post("/login", json={"username": user.username, "password": PASSWORD})
+        assert resp.status_code == 200, resp.text
+        return resp.json()
+
+    return _login
@@ -0,0 +1,42 @@
+from passlib.hash import bcrypt
+from sqlalchemy import event
+
+from app import models
+from app.db import engine
+from tests.conftest import PASSWORD
+
+
+def test_login_upgrades_bcrypt_hash_without_reloading_user(client, db, make_user):
+    user = make_user()
+    user.hashed_password = bcrypt.hash(PASSWORD)
+    db.commit()
+    username, user_id = user.username, user.id
+
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        resp = client.post("/login", json={"username": username, "password": PASSWORD})
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert resp.status_code == 200
+    db.expire_all()
+    assert db.get(models.User, user_id).hashed_password.startswith("$argon2id$")
+    # lookup, hash upgrade, refresh-token insert: the expired user is never re-selected after commit
+    assert sum(s.lstrip().upper().startswith("SELECT") for s in statements) == 1
+
+
+def test_login_rejects_bad_password(client, make_user):
+    user = make_user()
+
+    resp = client.post("/login", json={"username": user.username, "password": "wrong"})
+
+    assert resp.status_code == 401
+
+
+def test_login_requires_username_or_email(client):
+    assert client.post("/login", json={"password": PASSWORD}).status_code == 422
@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import insert
+
+from app import models, schemas
+from tests.conftest import unique
+
+
+def _collect(client, path: str, max_pages: int = 20):
+    ids, url = [], path
+    for _ in range(max_pages):
+        body = client.get(url).json()
+        ids += [item["id"] for item in body["items"]]
+        if not body["next_cursor"]:
+            return ids
+        url = f"{path}&after={body['next_cursor']}"
+    raise AssertionError(f"cursor did not terminate: {ids}")
+
+
+def _seed_projects(db, owner_id: int, count: int):
+    # one multi-row INSERT so created_at comes from the server default and rows share a second
+    rows = [{"name": unique("proj"), "owner_id": owner_id} for _ in range(count)]
+    db.execute(insert(models.Project), rows)
+    db.commit()
+
+
+def test_keyset_cursor_walks_rows_created_in_same_second(client, db, make_user):
+    owner = make_user()
+    _seed_projects(db, owner.id, 5)
+
+    ids = _collect(client, f"/projects?owner_id={owner.id}&per_page=2")
+
+    assert len(ids) == 5
+    assert len(set(ids)) == 5
+    assert ids == sorted(ids, reverse=True)
+
+
+def test_keyset_cursor_ascending(client, db, make_user):
+    owner = make_user()
+    _seed_projects(db, owner.id, 5)
+
+    ids = _collect(client, f"/projects?owner_id={owner.id}&per_page=2&sort_order=asc")
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == 5
+
+
+def test_keyset_cursor_matches_offset_pages(client, db, make_user):
+    owner = make_user()
+    _seed_projects(db, owner.id, 4)
+    base = f"/projects?owner_id={owner.id}&per_page=2"
+
+    first = client.get(base).json()
+    second_by_cursor = client.get(f"{base}&after={first['next_cursor']}").json()
+    second_by_offset = client.get(f"{base}&page=2").json()
+
+    assert first["total"] == 4
+    assert [p["id"] for p in second_by_cursor["items"]] == [p["id"] for p in second_by_offset["items"]]
+
+
+def test_invalid_cursor_is_rejected(client):
+    resp = client.get("/projects?after=not-a-cursor")
+
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Invalid cursor"
+
+
+def test_exact_multiple_of_page_size_has_no_trailing_cursor(client, db, make_user):
+    owner = make_user()
+    _seed_projects(db, owner.id, 4)
+    base = f"/projects?owner_id={owner.id}&per_page=2"
+
+    second = client.get(f"{base}&after={client.get(base).json()['next_cursor']}").json()
+
+    assert len(second["items"]) == 2
+    assert second["next_cursor"] is None
+
+
+@pytest.mark.parametrize("changed", ["sort_order=asc", "sort_by=name"])
+def test_cursor_from_another_sort_is_rejected(client, db, make_user, changed):
+    owner = make_user()
+    _seed_projects(db, owner.id, 3)
+    base = f"/projects?owner_id={owner.id}&per_page=2"
+    cursor = client.get(base).json()["next_cursor"]
+
+    resp = client.get(f"{base}&{changed}&after={cursor}")
+
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Cursor does not match sort_by/sort_order"
+
+
+def test_list_body_matches_response_model(client, db, make_user):
+    owner = make_user()
+    _seed_projects(db, owner.id, 2)
+
+    body = client.get(f"/projects?owner_id={owner.id}").json()
+
+    # e.g. a UTC created_at must come out as pydantic writes it ("Z"), not "+00:00"
+    assert body == schemas.PaginatedProjects.model_validate(body).model_dump(mode="json")
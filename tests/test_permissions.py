@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app import auth, models, permissions
+from tests.conftest import PASSWORD, bearer, unique
+
+
+def _access_token(user) -> str:
+    return auth.create_access_token(user.id)[0]
+
+
+def test_principal_cache_hit_stays_on_event_loop(db, make_user, monkeypatch):
+    user = make_user(role="manager")
+    token = _access_token(user)
+    assert asyncio.run(auth.get_current_principal(token, db)) == auth.Principal(user.id, "manager")
+
+    async def no_threadpool(*args, **kwargs):
+        raise AssertionError("cache hit must not use the threadpool")
+
+    monkeypatch.setattr(auth, "run_in_threadpool", no_threadpool)
+    assert asyncio.run(auth.get_current_principal(token, db)) == auth.Principal(user.id, "manager")
+
+
+def test_principal_rejects_revoked_token(db, make_user):
+    user = make_user()
+    token = _access_token(user)
+    payload = auth.decode_token(token)
+    auth.add_access_token_to_blocklist(db, payload["jti"], auth._now() + auth.ACCESS_TOKEN_EXPIRES)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(auth.get_current_principal(token, db))
+
+    assert exc.value.status_code == 401
+
+
+def test_principal_rejects_inactive_user(db, make_user):
+    user = make_user(role="admin")
+    user.is_active = False
+    db.commit()
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(auth.get_current_principal(_access_token(user), db))
+
+    assert exc.value.status_code == 403
+
+
+def test_denials_are_fresh_exceptions():
+    checker = permissions.RequireRoles({"manager"})
+    principal = auth.Principal(1, "developer")
+
+    raised = []
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(checker(principal))
+        raised.append(exc.value)
+
+    assert raised[0].status_code == 403
+    assert raised[0] is not raised[1]
+
+
+def test_require_roles_equal_role_sets_share_cache_key():
+    assert permissions.require_roles("manager", "developer") == permissions.RequireRoles({"developer", "manager"})
+    assert hash(permissions.require_roles("manager")) == hash(permissions.RequireRoles(["manager"]))
+    assert permissions.require_roles("manager") != permissions.require_roles("developer")
+
+
+@pytest.mark.parametrize("role, allowed", [("admin", True), ("manager", True), ("developer", False), (None, False)])
+def test_require_roles(role, allowed):
+    checker = permissions.require_roles("manager")
+    principal = auth.Principal(1, role)
+
+    if allowed:
+        assert asyncio.run(checker(principal)) == principal
+    else:
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(checker(principal))
+        assert exc.value.status_code == 403
+
+
+def test_bulk_register_is_admin_only(client, make_user, login):
+    payload = [{"username": unique("bulk"), "email": f"{unique('bulk')}@example.com", "password": PASSWORD}]
+
+    developer = login(make_user())
+    assert client.post("/register/bulk", json=payload, headers=bearer(developer)).status_code == 403
+
+    admin = login(make_user(role="admin"))
+    resp = client.post("/register/bulk", json=payload, headers=bearer(admin))
+    assert resp.status_code == 200
+    assert len(resp.json()["ids"]) == 1
+
+
+@pytest.mark.parametrize("role, is_owner, expected", [
+    ("developer", True, 200),
+    ("manager", False, 200),
+    ("admin", False, 200),
+    ("developer", False, 403),
+])
+def test_require_project_owner_or_manager(db, project, role, is_owner, expected):
+    principal = auth.Principal(project.owner_id if is_owner else -1, role)
+
+    call = permissions.require_project_owner_or_manager(project.id, db, principal)
+    if expected == 200:
+        assert asyncio.run(call) == project.id
+    else:
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(call)
+        assert exc.value.status_code == expected
+
+
+def test_require_project_owner_or_manager_missing_project(db):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(permissions.require_project_owner_or_manager(987654321, db, auth.Principal(1, "admin")))
+
+    assert exc.value.status_code == 404
+
+
+def test_issue_permission_checks(db, project, make_user):
+    reporter, assignee = make_user(), make_user()
+    issue = models.Issue(title=unique("issue"), description="details", project_id=project.id, reporter_id=reporter.id, assignee_id=assignee.id)
+    db.add(issue)
+    db.commit()
+
+    loaded = asyncio.run(permissions.load_issue(issue.id, db))
+    as_reporter = auth.Principal(reporter.id, "reporter")
+    as_assignee = auth.Principal(assignee.id, "developer")
+    stranger = auth.Principal(-1, "developer")
+    manager = auth.Principal(-1, "manager")
+    admin = auth.Principal(-1, "admin")
+
+    assert asyncio.run(permissions.require_issue_reporter_or_roles(loaded, as_reporter)) is loaded
+    assert asyncio.run(permissions.require_issue_assignee_or_roles(loaded, as_assignee)) is loaded
+    for check in (
+        permissions.require_issue_reporter_or_roles,
+        permissions.require_issue_assignee_or_roles,
+        permissions.require_issue_participant_or_manager,
+    ):
+        for principal in (manager, admin):
+            assert asyncio.run(check(loaded, principal)) is loaded
+    for principal in (as_reporter, as_assignee):
+        assert asyncio.run(permissions.require_issue_participant_or_manager(loaded, principal)) is loaded
+    for check, principal in (
+        (permissions.require_issue_reporter_or_roles, as_assignee),
+        (permissions.require_issue_assignee_or_roles, as_reporter),
+        (permissions.require_issue_participant_or_manager, stranger),
+    ):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(check(loaded, principal))
+        assert exc.value.status_code == 403
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(permissions.load_issue(987654321, db))
+    assert exc.value.status_code == 404
@@ -0,0 +1,119 @@
+import pytest
+from fastapi import HTTPException
+
+from app import models, state_machine
+from tests.conftest import unique
+
+
+@pytest.fixture
+def make_issue(db, project):
+    project_id = project.id
+
+    def _make_issue(status: str = "open", priority: str = "medium") -> int:
+        issue = models.Issue(title=unique("issue"), project_id=project_id, status=status, priority=priority)
+        db.add(issue)
+        db.commit()
+        issue_id = issue.id
+        db.expunge_all()
+        return issue_id
+
+    return _make_issue
+
+
+def _add_comment(db, issue_id: int):
+    db.add(models.Comment(issue_id=issue_id, content="looked into it"))
+    db.commit()
+
+
+@pytest.mark.parametrize(
+    "current, target",
+    [("open", "in_progress"), ("in_progress", "resolved"), ("resolved", "closed"), ("closed", "open"), ("open", "rejected")],
+)
+def test_allowed_transitions(current, target):
+    state_machine.validate_transition(current, target)
+
+
+@pytest.mark.parametrize("current, target", [("open", "closed"), ("closed", "resolved"), ("rejected", "in_progress"), ("bogus", "open")])
+def test_invalid_transitions(current, target):
+    with pytest.raises(HTTPException) as exc:
+        state_machine.validate_transition(current, target)
+    assert exc.value.status_code == 400
+
+
+def test_same_status_is_allowed():
+    state_machine.validate_transition("resolved", "resolved")
+
+
+def test_change_status_updates_row(db, make_issue):
+    issue_id = make_issue("open")
+
+    issue = state_machine.change_issue_status(db, issue_id, "in_progress", None)
+
+    assert issue.status == "in_progress"
+    db.expire_all()
+    assert db.get(models.Issue, issue_id).status == "in_progress"
+
+
+def test_change_status_refreshes_issue_already_in_session(db, make_issue):
+    issue_id = make_issue("open")
+    loaded = db.get(models.Issue, issue_id)  # as permissions.load_issue would
+
+    issue = state_machine.change_issue_status(db, issue_id, "in_progress", None)
+
+    assert issue is loaded
+    assert issue in db
+    assert loaded.status == "in_progress"
+
+
+def test_same_status_returns_without_write(db, make_issue):
+    issue_id = make_issue("resolved")
+
+    issue = state_machine.change_issue_status(db, issue_id, "resolved", None)
+
+    assert issue.id == issue_id
+    assert issue.status == "resolved"
+
+
+def test_invalid_transition_is_rejected(db, make_issue):
+    issue_id = make_issue("open")
+
+    with pytest.raises(HTTPException) as exc:
+        state_machine.change_issue_status(db, issue_id, "closed", None)
+
+    assert exc.value.status_code == 400
+
+
+def test_missing_issue_is_404(db):
+    with pytest.raises(HTTPException) as exc:
+        state_machine.change_issue_status(db, 987654321, "closed", None)
+
+    assert exc.value.status_code == 404
+
+
+def test_critical_issue_needs_comment_before_closing(db, make_issue):
+    issue_id = make_issue("in_progress", priority="critical")
+
+    with pytest.raises(HTTPException) as exc:
+        state_machine.change_issue_status(db, issue_id, "closed", None)
+    assert exc.value.status_code == 400
+
+    _add_comment(db, issue_id)
+    assert state_machine.change_issue_status(db, issue_id, "closed", None).status == "closed"
+
+
+def test_concurrent_status_change_is_409(db, make_issue, monkeypatch):
+    issue_id = make_issue("open")
+    real_validate = state_machine.validate_transition
+
+    def validate_then_race(current, target):
+        real_validate(current, target)
+        # another request moves the issue between our read and our conditional UPDATE
+        with db.get_bind().begin() as conn:
+            conn.execute(models.Issue.__table__.update().where(models.Issue.id == issue_id).values(status="rejected"))
+
+    monkeypatch.setattr(state_machine, "validate_transition", validate_then_race)
+
+    with pytest.raises(HTTPException) as exc:
+        state_machine.change_issue_status(db, issue_id, "in_progress", None)
+
+    assert exc.value.status_code == 409
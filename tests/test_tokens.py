@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+import jwt
+from sqlalchemy import select
+
+from app import auth, models
+from app.jobs import gc
+from tests.conftest import PASSWORD, bearer, unique
+
+
+def test_refresh_rotates_token(client, make_user, login):
+    tokens = login(make_user())
+
+    rotated = client.post("/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+    assert rotated.status_code == 200
+    new_tokens = rotated.json()
+    assert new_tokens["refresh_token"] != tokens["refresh_token"]
+    assert client.post("/refresh", json={"refresh_token": new_tokens["refresh_token"]}).status_code == 200
+
+
+def test_refresh_replay_revokes_every_token_of_the_user(client, db, make_user, login):
+    user = make_user()
+    first = login(user)
+    other_session = login(user)
+    rotated = client.post("/refresh", json={"refresh_token": first["refresh_token"]}).json()
+
+    replay = client.post("/refresh", json={"refresh_token": first["refresh_token"]})
+
+    assert replay.status_code == 401
+    assert "reuse detected" in replay.json()["detail"]
+    for tokens in (rotated, other_session):
+        assert client.post("/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+    active = db.scalars(
+        select(models.RefreshToken).where(models.RefreshToken.user_id == user.id, models.RefreshToken.revoked.is_(False))
+    ).all()
+    assert active == []
+
+
+def test_refresh_after_logout_keeps_other_sessions(client, make_user, login):
+    user = make_user()
+    # the logged-out session was itself rotated once, so it is not the user's first token
+    rotated = client.post("/refresh", json={"refresh_token": login(user)["refresh_token"]}).json()
+    other_session = login(user)
+    client.post("/logout", json={"refresh_token": rotated["refresh_token"]})
+
+    replay = client.post("/refresh", json={"refresh_token": rotated["refresh_token"]})
+
+    assert replay.status_code == 401
+    assert replay.json()["detail"] == "Refresh token revoked or expired"
+    assert client.post("/refresh", json={"refresh_token": other_session["refresh_token"]}).status_code == 200
+
+
+def test_refresh_rejects_access_token(client, make_user, login):
+    tokens = login(make_user())
+
+    resp = client.post("/refresh", json={"refresh_token": tokens["access_token"]})
+
+    assert resp.status_code == 400
+
+
+def test_logout_revokes_refresh_and_access_tokens(client, make_user, login):
+    tokens = login(make_user())
+
+    resp = client.post("/logout", json={"refresh_token": tokens["refresh_token"]}, headers=bearer(tokens))
+
+    assert resp.status_code == 200
+    assert client.get("/me", headers=bearer(tokens)).status_code == 401
+    assert client.post("/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+
+def test_jti_lookup_key_is_stable_64_bit():
+    jti = auth._jti()
+
+    assert len(jti) == 24
+    assert auth.jti_hash(jti) == auth.jti_hash(jti)
+    assert -(2**63) <= auth.jti_hash(jti) < 2**63
+
+
+def test_jwks_kid_matches_token_header(client, make_user, login):
+    tokens = login(make_user())
+    jwks = client.get("/.well-known/jwks.json").json()
+
+    assert jwt.get_unverified_header(tokens["access_token"])["kid"] == jwks["keys"][0]["kid"]
+
+
+def test_register_then_login(client):
+    name = unique("reg")
+
+    resp = client.post("/register", json={"username": name, "email": f"{name}@example.com", "password": PASSWORD})
+    assert resp.status_code == 200
+    assert resp.json()["username"] == name
+
+    dup = client.post("/register", json={"username": name, "email": f"other-{name}@example.com", "password": PASSWORD})
+    assert dup.status_code == 400
+    assert dup.json()["detail"] == "username already registered"
+
+    tokens = client.post("/login", json={"email": f"{name}@example.com", "password": PASSWORD}).json()
+    assert tokens["access_expires_in"] == int(auth.ACCESS_TOKEN_EXPIRES.total_seconds())
+    assert tokens["refresh_expires_in"] == int(auth.REFRESH_TOKEN_EXPIRES.total_seconds())
+    assert client.get("/me", headers=bearer(tokens)).json()["username"] == name
+
+
+def test_gc_deletes_only_tokens_past_grace(db, make_user):
+    user = make_user()
+    now = auth._now()
+    rows = {}
+    for label, expires_at in (("stale", now - gc.EXPIRED_GRACE - timedelta(hours=1)), ("fresh", now + timedelta(hours=1))):
+        jti = auth._jti()
+        db.add(models.RefreshToken(jti=jti, jti_hash=auth.jti_hash(jti), user_id=user.id, expires_at=expires_at))
+        rows[label] = jti
+    db.commit()
+
+    assert gc.delete_expired(db) >= 1
+
+    remaining = set(db.scalars(select(models.RefreshToken.jti).where(models.RefreshToken.user_id == user.id)))
+    assert remaining == {rows["fresh"]}